@@ -12,7 +12,12 @@
     python img2pdf.py <src_dir> <out_dir> [--pdfa]
 
 依赖:
-    pip install pillow reportlab pytesseract
+    pip install pillow-simd reportlab pytesseract
+    （pillow-simd 为 Pillow 的 SIMD 加速分支，API 完全兼容；
+      建议配合 libjpeg-turbo 编译安装以加速 JPEG 编解码：
+      conda install -c conda-forge libjpeg-turbo
+      CFLAGS="-mavx2" pip install --no-binary :all: --force-reinstall pillow-simd
+      无法安装时退回 pip install pillow 亦可运行）
 系统需安装:
     - Tesseract OCR（仅在 OCR 兜底时使用）
     - Ghostscript（若使用 --pdfa）
@@ -22,28 +27,51 @@ import os
 import sys
 import re
 import argparse
+import gc
+import hashlib
+import itertools
 import tempfile
+import threading
 import traceback
+from collections import deque
 from io import BytesIO
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import multiprocessing
 
-from PIL import Image, ExifTags
+# Tesseract 内部 OpenMP 与外层并行互相争抢，强制单线程子进程
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+from PIL import Image, UnidentifiedImageError
+
+# 处理对象是本地受信扫描件，跳过 Pillow 每次 open 的解压炸弹检查
+Image.MAX_IMAGE_PIXELS = None
+
+from reportlab import rl_config
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4, landscape, portrait
 from reportlab.lib.utils import ImageReader
 
-# OpenCV and pytesseract imports
-try:
-    import cv2
-except Exception:
-    cv2 = None
+# 禁用 ASCII85：JPEG 流保持二进制写入，省去编码开销且文件小约 25%
+rl_config.useA85 = 0
 
 try:
     import pytesseract
 except Exception:
     pytesseract = None
 
+# tesserocr optional：常驻 OSD 实例，免去每张图一次 tesseract 进程启动
+try:
+    from tesserocr import PSM, PyTessBaseAPI
+except Exception:
+    PyTessBaseAPI = None
+
+# pikepdf optional：JPEG 字节直拷贝进 /DCTDecode XObject，旋转用页面
+# /Rotate 表达，热路径上解码和编码都归零
+try:
+    import pikepdf
+except Exception:
+    pikepdf = None
+
 # colorama optional
 try:
     from colorama import init as colorama_init, Fore, Style
@@ -61,6 +89,11 @@ A4_W, A4_H = A4
 
 
 # ---------------- Logging ----------------
+# --quiet：跳过逐页 [PROC] 输出。热循环里的 f-string 格式化和 stdout
+# 锁（多进程下各 worker 争同一终端）都在调用点用该开关绕开
+VERBOSE = os.environ.get("IMG2PDF_QUIET") != "1"
+
+
 def log_info(msg):
     print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} {msg}")
 
@@ -81,6 +114,21 @@ def log_err(msg):
     print(f"{Fore.RED}[ERR]{Style.RESET_ALL} {msg}")
 
 
+# ---------------- Runtime environment check ----------------
+def check_jpeg_turbo():
+    """检查 Pillow 是否链接 libjpeg-turbo（否则提示安装 pillow-simd 提速）"""
+    try:
+        from PIL import features
+
+        if features.check_feature("libjpeg_turbo") is False:
+            log_warn(
+                "当前 Pillow 未链接 libjpeg-turbo，JPEG 编解码较慢；"
+                "建议安装 pillow-simd + libjpeg-turbo（见文件头部说明）"
+            )
+    except Exception:
+        pass
+
+
 # ---------------- Natural sort ----------------
 _nat_re = re.compile(r"(\d+)")
 
@@ -97,34 +145,85 @@ def natural_key(s: str):
 
 
 # ---------------- EXIF orientation correction ----------------
-def correct_exif_orientation(im: Image.Image) -> Image.Image:
+# EXIF Orientation 标签号为 TIFF 标准固定值，免去每张图遍历 ExifTags.TAGS
+_ORIENTATION_TAG = 0x0112
+
+
+# 顺时针角度 → transpose 操作（transpose 为 CCW 语义，故 90°CW = ROTATE_270）
+_ROT_TRANSPOSE = {
+    90: Image.Transpose.ROTATE_270,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_90,
+}
+
+
+def correct_exif_orientation(im: Image.Image):
+    """返回 (im, exif_informative)；后者表示 EXIF 已给出明确方向"""
+    exif_informative = False
     try:
-        exif = im._getexif()
-        if not exif:
-            return im
-        orientation_key = next(
-            (k for k, v in ExifTags.TAGS.items() if v == "Orientation"), None
-        )
-        if orientation_key and orientation_key in exif:
-            orientation = exif[orientation_key]
-            if orientation == 3:
-                im = im.rotate(180, expand=True)
-            elif orientation == 6:
-                im = im.rotate(270, expand=True)
-            elif orientation == 8:
-                im = im.rotate(90, expand=True)
+        orientation = im.getexif().get(_ORIENTATION_TAG, 1)
+        exif_informative = orientation > 1
+        # transpose 走专用 90°/180° 像素重排内核，比通用仿射 rotate 快
+        if orientation == 3:
+            im = im.transpose(Image.Transpose.ROTATE_180)
+        elif orientation == 6:
+            im = im.transpose(Image.Transpose.ROTATE_270)
+        elif orientation == 8:
+            im = im.transpose(Image.Transpose.ROTATE_90)
     except Exception:
         pass
-    return im
+    return im, exif_informative
 
 
 # ---------------- Tesseract OCR based rotation detection ----------------
+_osd_local = threading.local()
+
+
+def _get_osd_api():
+    """每个线程复用一个 OSD_ONLY 实例（tesseract 初始化约 100-300ms/次）"""
+    api = getattr(_osd_local, "api", None)
+    if api is None:
+        api = PyTessBaseAPI(psm=PSM.OSD_ONLY)
+        _osd_local.api = api
+    return api
+
+
+def _osd_thumbnail(im: Image.Image) -> Image.Image:
+    """OSD 只需粗略版面信息：取中央 80% 区域并把长边缩到 700px。
+
+    方向判断基本不依赖页面边缘，700px 足以做 4 选 1 分类；
+    裁剪和降采样的开销都随像素数线性下降，先裁再缩省得最多。
+    """
+    w, h = im.size
+    if min(w, h) >= 64:
+        dx, dy = w // 10, h // 10
+        thumb = im.crop((dx, dy, w - dx, h - dy))
+    else:
+        thumb = im.copy()
+    thumb.thumbnail((700, 700), Image.Resampling.BILINEAR)
+    return thumb
+
+
 def detect_ocr_rotation(im: Image.Image):
     """使用 Tesseract OCR 检测图片方向（返回需顺时针旋转角度）"""
-    if pytesseract is None:
-        return None  # Tesseract not available
+    if PyTessBaseAPI is None and pytesseract is None:
+        return None  # 无 OSD 引擎可用，缩略图也不必做
+    im = _osd_thumbnail(im)
+    if PyTessBaseAPI is not None:
+        try:
+            api = _get_osd_api()
+            api.SetImage(im)
+            osd = api.DetectOrientationScript()
+            api.Clear()
+            if osd and osd.get("orient_deg") is not None:
+                # orient_deg 为文字当前方向，需反向旋转归正
+                return (360 - int(osd["orient_deg"])) % 360
+            return None
+        except Exception as e:
+            log_warn(f"OSD 方向检测异常：{e.__class__.__name__}")
+            return None
     try:
-        osd = pytesseract.image_to_osd(im)
+        osd = pytesseract.image_to_osd(im, config="-c min_characters_to_try=50")
         for line in osd.splitlines():
             if line.startswith("Rotate:"):
                 angle = int(line.split(":")[1].strip())
@@ -143,39 +242,246 @@ def detect_ocr_rotation(im: Image.Image):
         return None
 
 
-# ---------------- OCR fallback detection ----------------
-def detect_rotation_ocr(image_path):
-    """使用 pytesseract 的 OSD 来检测需要顺时针旋转的角度（0/90/180/270）"""
-    if pytesseract is None:
-        return 0
+# ---------------- JPEG draft decode ----------------
+# A4@300DPI 的两倍作为 draft 提示；libjpeg 在解码阶段按 1/2、1/4、1/8
+# 档跳过高频 DCT 系数，超大手机照片可近乎免费地降采样
+_DRAFT_MAX = (int(A4_W * 300 / 72) * 2, int(A4_H * 300 / 72) * 2)
+
+
+def draft_decode(im: Image.Image) -> Image.Image:
+    """对 JPEG 启用 draft 解码提示（非 JPEG 格式忽略）"""
     try:
-        with Image.open(image_path) as im:
-            rgb = im.convert("RGB")
-            osd = pytesseract.image_to_osd(rgb)
-            for line in osd.splitlines():
-                if line.strip().startswith("Rotate:"):
-                    angle = int(line.split(":")[1].strip())
-                    return angle % 360
-    except Exception as e:
-        log_warn(f"OCR detect failed: {e}")
-    return 0
+        im.draft("RGB", _DRAFT_MAX)
+    except Exception:
+        pass
+    return im
+
+
+# ---------------- Concurrent OSD pre-pass ----------------
+# --always-ocr：即使 EXIF 已给出方向也跑 OSD（扫描件 EXIF 不可信时用）
+ALWAYS_OCR = os.environ.get("IMG2PDF_ALWAYS_OCR") == "1"
+
+# --trust-aspect：纵横比已明确横竖的图跳过 OSD。启发式只看长宽比，
+# 发现不了 180° 颠倒，也发现不了横放扫描的竖排文档（90°/270° 错向
+# 同样通过长宽比检验）；仅在确认素材方向可靠时使用
+TRUST_ASPECT = os.environ.get("IMG2PDF_TRUST_ASPECT") == "1"
+
+
+def _osd_rotation_for_path(img_path):
+    """单图 OSD：打开 → EXIF 校正 → 检测需顺时针旋转角度（并发预检用）"""
+    try:
+        with Image.open(img_path, formats=["JPEG"]) as im:
+            # 方向标签和尺寸都在文件头里，各免检分支先走完再碰像素
+            orientation = im.getexif().get(_ORIENTATION_TAG, 1)
+            if orientation > 1 and not ALWAYS_OCR:
+                # EXIF 来自拍摄设备，视为方向地面真值；OSD 绝大多数
+                # 情况下只会返回 0，白付一次 tesseract 调用
+                return 0
+            if TRUST_ASPECT:
+                w, h = im.size
+                if max(w, h) >= 1.2 * min(w, h):
+                    return 0
+            im = draft_decode(im)
+            im, _ = correct_exif_orientation(im)
+            rot = detect_ocr_rotation(im)
+        if rot is None:
+            rot = 0
+        return rot if rot in (0, 90, 180, 270) else 0
+    except Exception:
+        return 0
+
+
+def gather_osd_rotations(img_paths):
+    """并发预检整个目录的 OSD 旋转角度。
+
+    各 tesseract 调用相互独立，且子进程 I/O 期间释放 GIL，
+    线程池即可吃满多核；主循环随后按结果直接旋转。
+    """
+    if len(img_paths) <= 1:
+        return {p: _osd_rotation_for_path(p) for p in img_paths}
+    # 与页预处理池同一限流（IMG2PDF_INNER_THREADS）：外层最多 8 个
+    # 目录进程，裸 cpu_count 会叠出 8×核数个 tesseract 子进程
+    workers = _page_workers(len(img_paths))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(img_paths, pool.map(_osd_rotation_for_path, img_paths)))
 
 
 # ---------------- Ensure RGB ----------------
 def ensure_rgb(im: Image.Image) -> Image.Image:
+    if im.mode == "RGB":
+        return im
     if im.mode in ("RGBA", "LA"):
-        bg = Image.new("RGB", im.size, (255, 255, 255))
-        try:
-            bg.paste(im, mask=im.split()[-1])
-        except Exception:
-            bg.paste(im)
-        im = bg
-    elif im.mode != "RGB":
+        # alpha_composite 单次 C 向量化过整幅缓冲；
+        # split()+paste 会为每个通道各复制一份图像
+        if im.mode == "LA":
+            im = im.convert("RGBA")
+        white = Image.new("RGBA", im.size, (255, 255, 255, 255))
+        im = Image.alpha_composite(white, im).convert("RGB")
+    else:
         im = im.convert("RGB")
     return im
 
 
 # ---------------- Make PDF from images ----------------
+# 重编码页的嵌入分辨率上限（A4 页面、300DPI 对文档足够清晰）
+EMBED_DPI = 300
+
+# 重编码质量（--quality 可调）；4:2:0 子采样把色度字节减半，
+# 且 libjpeg-turbo 对 4:2:0 编码路径的 SIMD 加速约快 1.5×
+JPEG_QUALITY = int(os.environ.get("IMG2PDF_QUALITY", "75"))
+_EMBED_MAX_LONG = int(A4_H * EMBED_DPI / 72)
+_EMBED_MAX_SHORT = int(A4_W * EMBED_DPI / 72)
+
+
+def _resize_for_embed(im: Image.Image) -> Image.Image:
+    """超过 A4@EMBED_DPI 的页先缩到位，免得 reportlab 内部再重采样一遍。
+
+    BOX 是 Pillow(-SIMD) 里最快的降采样滤波，对文档锐度足够；
+    与 draft 解码叠加：libjpeg 先做 1/2、1/4、1/8 整档抽取，
+    这里只补最后的小数倍。
+    """
+    w, h = im.size
+    long_e, short_e = (w, h) if w >= h else (h, w)
+    f = min(_EMBED_MAX_LONG / long_e, _EMBED_MAX_SHORT / short_e, 1.0)
+    if f >= 1.0:
+        return im
+    return im.resize(
+        (max(1, round(w * f)), max(1, round(h * f))), Image.Resampling.BOX
+    )
+
+
+def _page_workers(n_pages):
+    """单目录内的解码线程数（外层多进程时可用 IMG2PDF_INNER_THREADS 限流）"""
+    env = os.environ.get("IMG2PDF_INNER_THREADS")
+    workers = int(env) if env else (os.cpu_count() or 1)
+    return max(1, min(workers, n_pages))
+
+
+def _prepare_page(img_path, rot):
+    """工作线程：解码 → EXIF 校正 → 旋转 → RGB →（必要时）重编码。
+
+    返回 (jpeg_bytes, w, h, content_hash)；jpeg_bytes 为 None 表示像素
+    未改动，可直接嵌入原始 JPEG，此时附带文件内容哈希供去重。
+    改动过的页在此编码成 JPEG 字节并立即 close 解码图，预取窗口里
+    驻留的是压缩字节而非裸像素——30MP 一页约 90MB 裸像素，乘上
+    预取深度足以 OOM。PIL 的解码/旋转/编码 C 路径释放 GIL，
+    多线程可并行吃满多核。
+    """
+    # 全程复用同一个二进制句柄：Image.open 不再解析路径，
+    # 直拷贝页的内容哈希也直接从句柄回绕读取，不二次 open
+    # formats=["JPEG"]：入口只收 .jpg/.jpeg，免去逐个解码器探测魔数
+    with open(img_path, "rb") as fh, Image.open(fh, formats=["JPEG"]) as im:
+        im_orig = im
+        im = draft_decode(im)
+        im, _ = correct_exif_orientation(im)
+        if rot != 0:
+            im = im.transpose(_ROT_TRANSPOSE[rot])
+        im = ensure_rgb(im)
+        if im is im_orig:
+            w, h = im.size
+            fh.seek(0)
+            digest = hashlib.blake2b(fh.read(), digest_size=16).hexdigest()
+            return None, w, h, digest
+        im = _resize_for_embed(im)
+        w, h = im.size
+        bio = BytesIO()
+        im.save(
+            bio,
+            format="JPEG",
+            quality=JPEG_QUALITY,
+            optimize=False,
+            progressive=False,
+            subsampling=2,
+        )
+        im.close()
+        return bio.getvalue(), w, h, None
+
+
+class PassthroughIneligible(Exception):
+    """某页无法以 JPEG 直拷贝方式写入，需回退 reportlab 路径"""
+
+
+# EXIF Orientation → 显示所需顺时针角度（镜像值 2/4/5/7 不支持直拷贝）
+_EXIF_ROT_CW = {1: 0, 3: 180, 6: 90, 8: 270}
+
+
+def make_pdf_from_images_passthrough(img_paths, rotations, out_path):
+    """JPEG 直拷贝装配 PDF：原始 JFIF 流进 /DCTDecode XObject。
+
+    不解码也不编码任何像素；EXIF/OSD 给出的 90° 倍数旋转写成页面
+    /Rotate 项，由阅读器显示时完成。遇到非 JPEG、CMYK/镜像 EXIF 等
+    情况抛 PassthroughIneligible，由调用方回退 reportlab 路径。
+    """
+    total = len(img_paths)
+    pdf = pikepdf.Pdf.new()
+    seen_xobjs = {}
+    try:
+        for idx, img_path in enumerate(img_paths, start=1):
+            img_name = os.path.basename(img_path)
+            if VERBOSE:
+                log_proc(f"    处理 {idx}/{total}: {img_name}（直拷贝）")
+            with open(img_path, "rb") as fh:
+                try:
+                    with Image.open(fh, formats=["JPEG"]) as probe:
+                        if probe.mode not in ("RGB", "L"):
+                            raise PassthroughIneligible(
+                                f"{img_name}: mode={probe.mode}"
+                            )
+                        orientation = probe.getexif().get(_ORIENTATION_TAG, 1)
+                        w, h = probe.size
+                        mode = probe.mode
+                except UnidentifiedImageError:
+                    # 扩展名是 .jpg 但内容不是 JPEG 流
+                    raise PassthroughIneligible(f"{img_name}: 非 JPEG 数据") from None
+                fh.seek(0)
+                raw = fh.read()
+            if orientation not in _EXIF_ROT_CW:
+                raise PassthroughIneligible(
+                    f"{img_name}: EXIF orientation={orientation}"
+                )
+            total_rot = (_EXIF_ROT_CW[orientation] + rotations.get(img_path, 0)) % 360
+            # 与 reportlab 路径一样按内容去重，重复页复用同一 XObject
+            key = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            xobj = seen_xobjs.get(key)
+            if xobj is None:
+                xobj = pikepdf.Stream(pdf, raw)
+                xobj.Type = pikepdf.Name.XObject
+                xobj.Subtype = pikepdf.Name.Image
+                xobj.Width = w
+                xobj.Height = h
+                xobj.ColorSpace = (
+                    pikepdf.Name.DeviceRGB if mode == "RGB" else pikepdf.Name.DeviceGray
+                )
+                xobj.BitsPerComponent = 8
+                xobj.Filter = pikepdf.Name.DCTDecode
+                seen_xobjs[key] = xobj
+
+            # MediaBox 按未旋转像素选横竖 A4；/Rotate 显示后即为校正方向
+            if w > h:
+                page_w, page_h = landscape(A4)
+            else:
+                page_w, page_h = portrait(A4)
+            scale = min(page_w / w, page_h / h)
+            new_w, new_h = w * scale, h * scale
+            x = (page_w - new_w) / 2
+            y = (page_h - new_h) / 2
+            content = f"q {new_w:.2f} 0 0 {new_h:.2f} {x:.2f} {y:.2f} cm /Im0 Do Q"
+            page = pikepdf.Dictionary(
+                Type=pikepdf.Name.Page,
+                MediaBox=[0, 0, page_w, page_h],
+                Resources=pikepdf.Dictionary(
+                    XObject=pikepdf.Dictionary(Im0=xobj)
+                ),
+                Contents=pikepdf.Stream(pdf, content.encode("ascii")),
+            )
+            if total_rot:
+                page.Rotate = total_rot
+            pdf.pages.append(pikepdf.Page(pdf.make_indirect(page)))
+        pdf.save(out_path)
+    finally:
+        pdf.close()
+
+
 def make_pdf_from_images(img_paths, out_pdf_path):
     out_dir = os.path.dirname(out_pdf_path)
     base_name = os.path.splitext(os.path.basename(out_pdf_path))[0]
@@ -184,46 +490,93 @@ def make_pdf_from_images(img_paths, out_pdf_path):
     )
     os.close(temp_fd)
     try:
-        c = canvas.Canvas(temp_path, pagesize=A4)
-        for idx, img_path in enumerate(img_paths, start=1):
-            img_name = os.path.basename(img_path)
-            log_proc(f"    处理 {idx}/{len(img_paths)}: {img_name}")
+        rotations = gather_osd_rotations(img_paths)
+        if pikepdf is not None:
             try:
-                with Image.open(img_path) as im:
-                    im = correct_exif_orientation(im)
-                    rot = detect_ocr_rotation(im)
-                    if rot is None:
-                        rot = detect_rotation_ocr(img_path)
-                    if rot not in (0, 90, 180, 270):
-                        rot = 0
-                    if rot != 0:
-                        im = im.rotate(-rot, expand=True)
-                        log_proc(f"      已按 {rot}° 旋转（顺时针）")
-                    im = ensure_rgb(im)
-                    w, h = im.size
-                    if w > h:
-                        page_size = landscape(A4)
-                        page_dir = "横向"
-                    else:
-                        page_size = portrait(A4)
-                        page_dir = "竖向"
-                    c.setPageSize(page_size)
-                    page_w, page_h = page_size
-                    scale = min(page_w / w, page_h / h)
-                    new_w, new_h = w * scale, h * scale
-                    x = (page_w - new_w) / 2
-                    y = (page_h - new_h) / 2
-                    bio = BytesIO()
-                    im.save(bio, format="JPEG")
-                    bio.seek(0)
-                    ir = ImageReader(bio)
-                    c.drawImage(ir, x, y, new_w, new_h, preserveAspectRatio=True)
-                    c.showPage()
-                    bio.close()
-            except Exception as e_img:
-                log_warn(f"      跳过图片 {img_name}（错误：{e_img}）")
-                traceback.print_exc()
-                continue
+                make_pdf_from_images_passthrough(img_paths, rotations, temp_path)
+                try:
+                    os.replace(temp_path, out_pdf_path)
+                except PermissionError:
+                    log_err(f"无法覆盖目标文件（可能被打开）：{out_pdf_path}")
+                    log_err(f"临时文件保留于：{temp_path}")
+                    return False
+                log_save(f"生成 PDF: {out_pdf_path}")
+                return True
+            except PassthroughIneligible as e:
+                log_proc(f"    JPEG 直拷贝不适用（{e}），回退 reportlab 路径")
+            except Exception as e:
+                # 直拷贝路径任何意外失败都不应拖垮整个目录，
+                # reportlab 路径功能完整，降级重做
+                log_warn(
+                    f"    JPEG 直拷贝失败（{e.__class__.__name__}: {e}），"
+                    f"回退 reportlab 路径"
+                )
+        # 页面内容流只有几条绘制指令，JPEG 体本身已是 DCT 压缩，
+        # zlib 再压纯属白烧 CPU，显式关闭
+        c = canvas.Canvas(temp_path, pagesize=A4, pageCompression=0)
+        total = len(img_paths)
+        workers = _page_workers(total)
+        # 预取窗口限制在 2×线程数，防止大图堆积撑爆内存；
+        # reportlab 非线程安全，canvas 写入始终留在主线程
+        prefetch = 2 * workers
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            seen_hashes = {}
+            paths_iter = iter(img_paths)
+            for img_path in itertools.islice(paths_iter, prefetch):
+                pending.append(
+                    (img_path, pool.submit(_prepare_page, img_path, rotations.get(img_path, 0)))
+                )
+            idx = 0
+            while pending:
+                img_path, fut = pending.popleft()
+                nxt = next(paths_iter, None)
+                if nxt is not None:
+                    pending.append(
+                        (nxt, pool.submit(_prepare_page, nxt, rotations.get(nxt, 0)))
+                    )
+                idx += 1
+                img_name = os.path.basename(img_path)
+                if VERBOSE:
+                    log_proc(f"    处理 {idx}/{total}: {img_name}")
+                try:
+                    jpeg_bytes, w, h, content_hash = fut.result()
+                except Exception as e_img:
+                    log_warn(f"      跳过图片 {img_name}（错误：{e_img}）")
+                    traceback.print_exc()
+                    continue
+                rot = rotations.get(img_path, 0)
+                if rot != 0 and VERBOSE:
+                    log_proc(f"      已按 {rot}° 旋转（顺时针）")
+                if w > h:
+                    page_size = landscape(A4)
+                    page_dir = "横向"
+                else:
+                    page_size = portrait(A4)
+                    page_dir = "竖向"
+                c.setPageSize(page_size)
+                page_w, page_h = page_size
+                scale = min(page_w / w, page_h / h)
+                new_w, new_h = w * scale, h * scale
+                x = (page_w - new_w) / 2
+                y = (page_h - new_h) / 2
+                if jpeg_bytes is None:
+                    # 直接交文件路径：reportlab 识别 JPEG 后原样拷贝
+                    # JFIF 流进 PDF，不解码也不重压缩。reportlab 按
+                    # 文件名缓存 XObject，内容相同的页统一用首次出现
+                    # 的路径，重复图片（如空白分隔页）只嵌入一次
+                    draw_path = seen_hashes.setdefault(content_hash, img_path)
+                    # new_w/new_h 已按 min-scale 等比算好，
+                    # 无需 reportlab 再做一遍纵横比夹取
+                    c.drawImage(draw_path, x, y, new_w, new_h)
+                else:
+                    ir = ImageReader(BytesIO(jpeg_bytes))
+                    c.drawImage(ir, x, y, new_w, new_h)
+                    # 写完立刻释放本页字节，内存峰值只由预取窗口决定
+                    del ir, jpeg_bytes
+                c.showPage()
+                if idx % 50 == 0:
+                    gc.collect()
         c.save()
         try:
             os.replace(temp_path, out_pdf_path)
@@ -278,36 +631,44 @@ def convert_to_pdfa_ghostscript(input_pdf, output_pdf):
 
 
 # ---------------- Directory utilities ----------------
+_JPG_EXTS = frozenset({".jpg", ".jpeg"})
+
+
+def _is_jpeg_name(name):
+    # 只小写扩展名而非整个文件名，百万级文件时省一大截字符串分配
+    return os.path.splitext(name)[1].lower() in _JPG_EXTS
+
+
 def gather_image_files_in_dir(dir_path):
     files = []
-    for fname in os.listdir(dir_path):
-        p = os.path.join(dir_path, fname)
-        if os.path.isfile(p) and fname.lower().endswith((".jpg", ".jpeg")):
-            files.append(fname)
+    # scandir 的 DirEntry.is_file() 复用 readdir 带回的类型，
+    # 免去 listdir + isfile 每个条目一次 stat 系统调用
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            name = entry.name
+            if entry.is_file(follow_symlinks=False) and _is_jpeg_name(name):
+                files.append(name)
     files.sort(key=natural_key)
     return [os.path.join(dir_path, f) for f in files]
 
 
-def collect_dirs_to_process(src_root):
-    dirs = []
+def iter_dirs_with_images(src_root):
+    """单遍扫描目录树，边走边产出 (目录, 排好序的图片列表)。
+
+    旧流程先 walk 一遍筛目录、worker 里再枚举一遍文件；合成一个
+    生成器后每个目录只列一次，且产出即可提交任务，首个结果来得更早。
+    """
     for current_dir, _, _ in os.walk(src_root):
-        imgs = [
-            f
-            for f in os.listdir(current_dir)
-            if os.path.isfile(os.path.join(current_dir, f))
-            and f.lower().endswith((".jpg", ".jpeg"))
-        ]
+        imgs = gather_image_files_in_dir(current_dir)
         if imgs:
-            dirs.append(current_dir)
-    return dirs
+            yield current_dir, imgs
 
 
 def process_one_dir(args_tuple):
-    current_dir, out_root, do_pdfa = args_tuple
+    current_dir, images, out_root = args_tuple
     try:
-        images = gather_image_files_in_dir(current_dir)
         if not images:
-            return (current_dir, False, "no_images")
+            return (current_dir, False, "no_images", None)
         dir_name = os.path.basename(os.path.normpath(current_dir))
         pdf_name = f"{dir_name}.pdf"
         if out_root:
@@ -318,50 +679,79 @@ def process_one_dir(args_tuple):
         log_info(f"[{dir_name}] 开始生成 PDF（{len(images)} 张） -> {out_pdf}")
         ok = make_pdf_from_images(images, out_pdf)
         if not ok:
-            return (current_dir, False, "make_pdf_failed")
-        if do_pdfa:
-            tmp_fd, tmp_pdfa = tempfile.mkstemp(
-                prefix=dir_name + "_pdfa_", suffix=".pdf", dir=os.path.dirname(out_pdf)
-            )
-            os.close(tmp_fd)
-            converted = convert_to_pdfa_ghostscript(out_pdf, tmp_pdfa)
-            if converted:
-                try:
-                    os.replace(tmp_pdfa, out_pdf)
-                except Exception as e:
-                    log_warn(f"替换 PDF/A 文件失败：{e}（临时文件保留：{tmp_pdfa}）")
-                    return (current_dir, False, "pdfa_replace_failed")
-            else:
-                try:
-                    if os.path.exists(tmp_pdfa):
-                        os.remove(tmp_pdfa)
-                except Exception:
-                    pass
-                return (current_dir, False, "pdfa_convert_failed")
-        return (current_dir, True, None)
+            return (current_dir, False, "make_pdf_failed", None)
+        return (current_dir, True, None, out_pdf)
     except Exception as e:
         traceback.print_exc()
-        return (current_dir, False, str(e))
+        return (current_dir, False, str(e), None)
+
+
+def convert_one_to_pdfa(out_pdf):
+    """单个 PDF 的 PDF/A 转换（成功则原地替换），返回是否成功"""
+    dir_name = os.path.splitext(os.path.basename(out_pdf))[0]
+    tmp_fd, tmp_pdfa = tempfile.mkstemp(
+        prefix=dir_name + "_pdfa_", suffix=".pdf", dir=os.path.dirname(out_pdf)
+    )
+    os.close(tmp_fd)
+    converted = convert_to_pdfa_ghostscript(out_pdf, tmp_pdfa)
+    if converted:
+        try:
+            os.replace(tmp_pdfa, out_pdf)
+            return True
+        except Exception as e:
+            log_warn(f"替换 PDF/A 文件失败：{e}（临时文件保留：{tmp_pdfa}）")
+            return False
+    try:
+        if os.path.exists(tmp_pdfa):
+            os.remove(tmp_pdfa)
+    except Exception:
+        pass
+    return False
+
+
+def convert_all_to_pdfa(pdf_paths):
+    """运行末尾统一做 PDF/A 转换。
+
+    gs 每次启动要加载 Resource 树和 ICC 配置（约 100-300ms），放在
+    生成全部完成后并发执行，把启动开销叠进彼此的转换时间里。
+    gs 单次调用列多个输入会把页面并成一个文件，不适用于逐目录输出，
+    故按文件并发而非合并调用。
+    """
+    workers = min(os.cpu_count() or 1, 8, len(pdf_paths))
+    log_info(f"开始 PDF/A 批量转换（{len(pdf_paths)} 个文件，并发 {workers}）")
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for ok in pool.map(convert_one_to_pdfa, pdf_paths):
+            if not ok:
+                failed += 1
+    if failed:
+        log_warn(f"PDF/A 转换失败 {failed}/{len(pdf_paths)} 个文件")
 
 
 def process_recursive_parallel(src_root, out_root=None, do_pdfa=False):
-    dirs = collect_dirs_to_process(src_root)
-    total = len(dirs)
-    log_info(f"共发现 {total} 个含图片的子目录。")
-    if total == 0:
-        return
     max_workers = min(os.cpu_count() or 1, 8)
+    # 外层已按目录多进程并行，限制每个子进程内部的解码线程数防止超订
+    os.environ["IMG2PDF_INNER_THREADS"] = str(
+        max(1, (os.cpu_count() or 1) // max_workers)
+    )
     log_info(f"开始并行处理（最大并发数 {max_workers}）")
-    tasks = [(d, out_root, do_pdfa) for d in dirs]
+    generated = []
     with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        future_to_dir = {executor.submit(process_one_dir, t): t[0] for t in tasks}
+        # 扫描产出一个目录就立刻提交一个任务，无需等全树扫完
+        future_to_dir = {
+            executor.submit(process_one_dir, (d, imgs, out_root)): d
+            for d, imgs in iter_dirs_with_images(src_root)
+        }
+        total = len(future_to_dir)
+        log_info(f"共发现 {total} 个含图片的子目录。")
         completed = 0
         for future in as_completed(future_to_dir):
             dirpath = future_to_dir[future]
             try:
-                current_dir, ok, reason = future.result()
+                current_dir, ok, reason, out_pdf = future.result()
                 completed += 1
                 if ok:
+                    generated.append(out_pdf)
                     log_save(f"[{completed}/{total}] 完成：{current_dir}")
                 else:
                     log_warn(
@@ -370,6 +760,8 @@ def process_recursive_parallel(src_root, out_root=None, do_pdfa=False):
             except Exception as e:
                 completed += 1
                 log_err(f"[{completed}/{total}] 子任务异常：{dirpath} | 错误：{e}")
+    if do_pdfa and generated:
+        convert_all_to_pdfa(generated)
 
 
 def main():
@@ -386,7 +778,39 @@ def main():
     parser.add_argument(
         "--pdfa", action="store_true", help="生成后使用 Ghostscript 转为 PDF/A-1b"
     )
+    parser.add_argument(
+        "--always-ocr",
+        action="store_true",
+        help="即使 EXIF 已给出方向也运行 OCR 方向检测（适用于 EXIF 不可信的扫描件）",
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="不输出逐页处理日志（多进程下可避免各 worker 争抢 stdout）",
+    )
+    parser.add_argument(
+        "--trust-aspect",
+        action="store_true",
+        help="纵横比明确横竖的图跳过 OCR 方向检测"
+        "（注意：无法发现 180° 颠倒，横放扫描的文档 90°/270° 错向同样漏检）",
+    )
+    parser.add_argument(
+        "--quality",
+        type=int,
+        default=75,
+        metavar="1-95",
+        help="重编码页的 JPEG 质量（默认 75，仅影响旋转/转码过的页）",
+    )
     args = parser.parse_args()
+    global ALWAYS_OCR, TRUST_ASPECT, JPEG_QUALITY, VERBOSE
+    VERBOSE = not args.quiet
+    os.environ["IMG2PDF_QUIET"] = "1" if args.quiet else "0"
+    ALWAYS_OCR = args.always_ocr
+    os.environ["IMG2PDF_ALWAYS_OCR"] = "1" if ALWAYS_OCR else "0"
+    TRUST_ASPECT = args.trust_aspect
+    os.environ["IMG2PDF_TRUST_ASPECT"] = "1" if TRUST_ASPECT else "0"
+    JPEG_QUALITY = max(1, min(95, args.quality))
+    os.environ["IMG2PDF_QUALITY"] = str(JPEG_QUALITY)
     src = os.path.abspath(args.src)
     if not os.path.isdir(src):
         log_err(f"源目录不存在：{src}")
@@ -394,6 +818,7 @@ def main():
     out_dir = os.path.abspath(args.out) if args.out else None
     if out_dir:
         os.makedirs(out_dir, exist_ok=True)
+    check_jpeg_turbo()
     log_info(f"开始处理源目录：{src}")
     if out_dir:
         log_info(f"输出目录：{out_dir}")
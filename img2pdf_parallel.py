@@ -13,19 +13,49 @@ import argparse
 import tempfile
 import traceback
 from io import BytesIO
-from PIL import Image, ExifTags
+from PIL import Image
+
+# 本地受信扫描件，跳过 Pillow 的解压炸弹检查
+Image.MAX_IMAGE_PIXELS = None
+
+from reportlab import rl_config
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4, landscape, portrait
 from reportlab.lib.utils import ImageReader
+
+# JPEG 流保持二进制写入，省去 ASCII85 编码开销
+rl_config.useA85 = 0
 import pytesseract
 from colorama import init as colorama_init, Fore, Style
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
 import multiprocessing
 
+# GPU JPEG 解码可选：有 NVIDIA GPU 时用 nvJPEG 解码大图（2-3× 于 CPU）
+try:
+    import torch
+    from torchvision.io import ImageReadMode, decode_jpeg, read_file
+except Exception:
+    torch = None
+
+# Tesseract 内部 OpenMP 并行效率低，且与进程池互抢核心，强制单线程
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 # 初始化颜色
 colorama_init(autoreset=True)
 A4_W, A4_H = A4
 
+# 由 --gpu-decode 开启（经环境变量传给子进程，spawn 模式下亦生效）；
+# 小图 nvJPEG 受 JPEG 头解析带宽限制反而不划算
+GPU_DECODE = os.environ.get("IMG2PDF_GPU_DECODE") == "1"
+_GPU_MIN_PIXELS = 1000 * 1000
+
+# --force-detect：不信任 EXIF、对每张图都跑 OCR 方向检测
+FORCE_DETECT = os.environ.get("IMG2PDF_FORCE_DETECT") == "1"
+
+# A4@300DPI 的两倍作为 draft 解码提示；libjpeg 按 1/2、1/4、1/8 档
+# 跳过高频 DCT 系数，超大手机照片近乎免费地降采样
+_DRAFT_MAX = (int(A4_W * 300 / 72) * 2, int(A4_H * 300 / 72) * 2)
+
 
 # ========= 日志函数 =========
 def log_info(msg): print(f"{Fore.CYAN}[INFO]{Style.RESET_ALL} {msg}")
@@ -36,22 +66,33 @@ def log_err(msg): print(f"{Fore.RED}[ERR]{Style.RESET_ALL} {msg}")
 
 
 # ========= 图像处理 =========
-def correct_exif_orientation(im: Image.Image) -> Image.Image:
+# EXIF Orientation 标签号为 TIFF 标准固定值，免去每张图遍历 ExifTags.TAGS
+_ORIENTATION_TAG = 0x0112
+
+# 顺时针角度 → transpose 操作（transpose 为 CCW 语义，故 90°CW = ROTATE_270）；
+# transpose 走专用 90°/180° 像素重排内核，比通用仿射 rotate 快且省一半峰值内存
+_ROT_TRANSPOSE = {
+    90: Image.Transpose.ROTATE_270,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_90,
+}
+
+
+def correct_exif_orientation(im: Image.Image):
+    """返回 (im, exif_informative)；后者表示 EXIF 已给出明确方向"""
+    exif_informative = False
     try:
-        exif = im._getexif()
-        if not exif: return im
-        orientation_key = next((k for k, v in ExifTags.TAGS.items() if v == "Orientation"), None)
-        if orientation_key and orientation_key in exif:
-            orientation = exif[orientation_key]
-            if orientation == 3:
-                im = im.rotate(180, expand=True)
-            elif orientation == 6:
-                im = im.rotate(270, expand=True)
-            elif orientation == 8:
-                im = im.rotate(90, expand=True)
+        orientation = im.getexif().get(_ORIENTATION_TAG, 1)
+        exif_informative = orientation > 1
+        if orientation == 3:
+            im = im.transpose(Image.Transpose.ROTATE_180)
+        elif orientation == 6:
+            im = im.transpose(Image.Transpose.ROTATE_270)
+        elif orientation == 8:
+            im = im.transpose(Image.Transpose.ROTATE_90)
     except Exception:
         pass
-    return im
+    return im, exif_informative
 
 
 def detect_ocr_rotation(im: Image.Image):
@@ -66,58 +107,134 @@ def detect_ocr_rotation(im: Image.Image):
         return 0
 
 
+def _gpu_available():
+    return torch is not None and torch.cuda.is_available()
+
+
+def open_image(img_path):
+    """打开一张图；启用 GPU 解码且图足够大时走 nvJPEG，失败回退 PIL。
+
+    返回 (im, exif_applied)。nvJPEG 解码结果不带 EXIF，方向校正用
+    探测句柄读到的标签在此补做；补做过时 exif_applied 为 True，
+    告知调用方像素已与原文件不同，该页不能按路径直嵌。
+    """
+    if GPU_DECODE and _gpu_available():
+        try:
+            with Image.open(img_path, formats=["JPEG"]) as probe:
+                w, h = probe.size
+                orientation = probe.getexif().get(_ORIENTATION_TAG, 1)
+            if w * h >= _GPU_MIN_PIXELS:
+                t = decode_jpeg(
+                    read_file(img_path), mode=ImageReadMode.RGB, device="cuda"
+                )
+                im = Image.fromarray(t.permute(1, 2, 0).contiguous().cpu().numpy())
+                if orientation == 3:
+                    im = im.transpose(Image.Transpose.ROTATE_180)
+                elif orientation == 6:
+                    im = im.transpose(Image.Transpose.ROTATE_270)
+                elif orientation == 8:
+                    im = im.transpose(Image.Transpose.ROTATE_90)
+                return im, orientation in (3, 6, 8)
+        except Exception as e:
+            log_warn(f"GPU 解码失败，回退 CPU：{e.__class__.__name__}")
+    # 入口只收 .jpg/.jpeg，限定解码器免去魔数探测
+    im = Image.open(img_path, formats=["JPEG"])
+    try:
+        im.draft("RGB", _DRAFT_MAX)  # 仅对 JPEG 生效
+    except Exception:
+        pass
+    return im, False
+
+
 def ensure_rgb(im: Image.Image) -> Image.Image:
+    if im.mode == "RGB":
+        return im
     if im.mode in ("RGBA", "LA"):
-        bg = Image.new("RGB", im.size, (255, 255, 255))
-        bg.paste(im, mask=im.split()[-1])
-        im = bg
-    elif im.mode != "RGB":
+        # alpha_composite 单次向量化过整幅缓冲，免去 split()+paste 的通道复制
+        if im.mode == "LA":
+            im = im.convert("RGBA")
+        white = Image.new("RGBA", im.size, (255, 255, 255, 255))
+        im = Image.alpha_composite(white, im).convert("RGB")
+    else:
         im = im.convert("RGB")
     return im
 
 
-# ========= PDF 生成 =========
-def make_pdf_from_images(img_paths, out_pdf_path):
+# ========= 单页预处理（进程池工作单元） =========
+def prepare_page(task):
+    """子进程：解码 → EXIF 校正 → OCR 旋转 → RGB →（必要时）编码。
+
+    task 为 (dir_key, idx, img_path)；返回 (dir_key, idx, jpeg_bytes, w, h)。
+    各处理步骤只在实际改动像素时才返回新对象，未改动时 jpeg_bytes
+    为 None——主进程直接嵌入原文件，整条编码链路都省掉。
+    失败返回 (dir_key, idx, None, 0, 0) 由主进程跳过该页。
+    """
+    dir_key, idx, img_path = task
+    try:
+        im, exif_applied = open_image(img_path)
+        with im:
+            im_orig = im
+            im, exif_informative = correct_exif_orientation(im)
+            # GPU 分支已按 EXIF 转置过：像素不再等同原文件，
+            # 且方向同样视为已知，OSD 可省
+            exif_informative = exif_informative or exif_applied
+            if exif_informative and not FORCE_DETECT:
+                # EXIF 来自拍摄设备，视为方向地面真值，OSD 可省
+                rot = 0
+            else:
+                rot = detect_ocr_rotation(im)
+            if rot not in (0, 90, 180, 270):
+                rot = 0
+            if rot != 0:
+                im = im.transpose(_ROT_TRANSPOSE[rot])
+            im = ensure_rgb(im)
+            w, h = im.size
+            if im is im_orig and not exif_applied:
+                return dir_key, idx, None, w, h
+            bio = BytesIO()
+            im.save(bio, format="JPEG")
+            return dir_key, idx, bio.getvalue(), w, h
+    except Exception as e:
+        log_warn(f"跳过图片 {os.path.basename(img_path)}（错误：{e}）")
+        return dir_key, idx, None, 0, 0
+
+
+# ========= PDF 生成（主进程装配） =========
+def make_pdf_from_pages(pages, out_pdf_path):
+    """将按序排列的 (jpeg_bytes, img_path, w, h) 页列表写入 PDF。
+
+    jpeg_bytes 为 None 的页直接按路径嵌入原始 JPEG（不解码不重压缩）。
+    """
     out_dir = os.path.dirname(out_pdf_path)
     base_name = os.path.splitext(os.path.basename(out_pdf_path))[0]
     temp_fd, temp_path = tempfile.mkstemp(prefix=base_name + "_", suffix=".pdf", dir=out_dir)
     os.close(temp_fd)
 
     try:
-        c = canvas.Canvas(temp_path, pagesize=A4)
-
-        for idx, img_path in enumerate(img_paths, start=1):
-            with Image.open(img_path) as im:
-                im = correct_exif_orientation(im)
-                rot = detect_ocr_rotation(im)
-                if rot not in (0, 90, 180, 270):
-                    rot = 0
-                if rot != 0:
-                    im = im.rotate(-rot, expand=True)
-
-                im = ensure_rgb(im)
-                w, h = im.size
-
-                # 页面方向
-                if w > h:
-                    page_size = landscape(A4)
-                else:
-                    page_size = portrait(A4)
-                c.setPageSize(page_size)
-                page_w, page_h = page_size
-
-                scale = min(page_w / w, page_h / h)
-                new_w, new_h = w * scale, h * scale
-                x = (page_w - new_w) / 2
-                y = (page_h - new_h) / 2
-
-                bio = BytesIO()
-                im.save(bio, format="JPEG")
-                bio.seek(0)
-                ir = ImageReader(bio)
-                c.drawImage(ir, x, y, new_w, new_h, preserveAspectRatio=True)
-                c.showPage()
-                bio.close()
+        # 内容流极小而 JPEG 体已压缩，关闭 zlib 再压
+        c = canvas.Canvas(temp_path, pagesize=A4, pageCompression=0)
+
+        for jpeg_bytes, img_path, w, h in pages:
+            # 页面方向
+            if w > h:
+                page_size = landscape(A4)
+            else:
+                page_size = portrait(A4)
+            c.setPageSize(page_size)
+            page_w, page_h = page_size
+
+            scale = min(page_w / w, page_h / h)
+            new_w, new_h = w * scale, h * scale
+            x = (page_w - new_w) / 2
+            y = (page_h - new_h) / 2
+
+            # new_w/new_h 已等比算好，无需 reportlab 再夹取纵横比
+            if jpeg_bytes is None:
+                c.drawImage(img_path, x, y, new_w, new_h)
+            else:
+                ir = ImageReader(BytesIO(jpeg_bytes))
+                c.drawImage(ir, x, y, new_w, new_h)
+            c.showPage()
 
         c.save()
         os.replace(temp_path, out_pdf_path)
@@ -132,50 +249,84 @@ def make_pdf_from_images(img_paths, out_pdf_path):
 
 
 # ========= 工具函数 =========
+_JPG_EXTS = frozenset({".jpg", ".jpeg"})
+
+
+def _is_jpeg_name(name):
+    # 只小写扩展名而非整个文件名，减少枚举期的字符串分配
+    return os.path.splitext(name)[1].lower() in _JPG_EXTS
+
+
 def gather_image_files_in_dir(dir_path):
-    imgs = [os.path.join(dir_path, f)
-            for f in os.listdir(dir_path)
-            if os.path.isfile(os.path.join(dir_path, f))
-            and f.lower().endswith((".jpg", ".jpeg"))]
+    # scandir 的 DirEntry.is_file() 复用 readdir 带回的类型，免去每条目一次 stat
+    imgs = []
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False) and _is_jpeg_name(entry.name):
+                imgs.append(os.path.join(dir_path, entry.name))
     imgs.sort()
     return imgs
 
 
-def process_one_dir(current_dir, out_root):
-    images = gather_image_files_in_dir(current_dir)
-    if not images:
-        return
+def output_pdf_path(current_dir, out_root):
     dir_name = os.path.basename(os.path.normpath(current_dir))
     pdf_name = f"{dir_name}.pdf"
-    out_pdf = os.path.join(out_root, pdf_name) if out_root else os.path.join(current_dir, pdf_name)
-    make_pdf_from_images(images, out_pdf)
+    return os.path.join(out_root, pdf_name) if out_root else os.path.join(current_dir, pdf_name)
 
 
 # ========= 并行主逻辑 =========
+def _worker_init():
+    """子进程初始化：环境变量会继承，此处兜底确保 tesseract 单线程"""
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
 def process_recursive_parallel(src_root, out_root=None):
-    all_dirs = []
+    """以“图片”而非“目录”为并行单元，目录大小悬殊时也能吃满核心。
+
+    子进程只做单页预处理；主进程收齐结果后按目录、按序装配 PDF
+    （reportlab canvas 不跨进程）。
+    """
+    dir_images = {}
     for current_dir, _, _ in os.walk(src_root):
         imgs = gather_image_files_in_dir(current_dir)
         if imgs:
-            all_dirs.append(current_dir)
+            dir_images[current_dir] = imgs
 
-    total = len(all_dirs)
+    total = len(dir_images)
     log_info(f"共发现 {total} 个含图片的子目录。")
     if total == 0:
         return
 
+    tasks = [
+        (d, idx, p)
+        for d, imgs in dir_images.items()
+        for idx, p in enumerate(imgs)
+    ]
     max_workers = min(os.cpu_count(), 8)
-    log_info(f"并行处理，最大并发数：{max_workers}")
-
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(process_one_dir, d, out_root): d for d in all_dirs}
-        for i, future in enumerate(as_completed(futures), 1):
-            d = futures[future]
-            try:
-                future.result()
-                log_save(f"[{i}/{total}] 完成：{d}")
-            except Exception as e:
-                log_err(f"[{i}/{total}] 子目录处理失败：{d} | 错误：{e}")
+    log_info(f"并行处理 {len(tasks)} 张图片，最大并发数：{max_workers}")
+
+    results = {d: [] for d in dir_images}
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_worker_init
+    ) as executor:
+        # chunksize 摊薄 IPC 开销；每个 worker 约领 4 批任务，兼顾负载均衡
+        chunksize = max(1, len(tasks) // (4 * max_workers))
+        for dir_key, idx, jpeg_bytes, w, h in executor.map(
+            prepare_page, tasks, chunksize=chunksize
+        ):
+            if w > 0:
+                results[dir_key].append((idx, jpeg_bytes, w, h))
+
+    for i, (d, imgs) in enumerate(dir_images.items(), 1):
+        pages = [
+            (jpeg_bytes, imgs[idx], w, h)
+            for idx, jpeg_bytes, w, h in sorted(results[d], key=lambda r: r[0])
+        ]
+        if not pages:
+            log_err(f"[{i}/{total}] 失败：{d} | 无可用页面")
+            continue
+        make_pdf_from_pages(pages, output_pdf_path(d, out_root))
+        log_save(f"[{i}/{total}] 完成：{d}")
 
 
 # ========= 主函数 =========
@@ -183,8 +334,26 @@ def main():
     parser = argparse.ArgumentParser(description="并行版图片转 A4 PDF（EXIF + OCR 方向检测）")
     parser.add_argument("src", help="源目录（必填）")
     parser.add_argument("out", nargs="?", default=None, help="输出目录（可选）")
+    parser.add_argument(
+        "--gpu-decode",
+        action="store_true",
+        help="用 NVIDIA nvJPEG 解码大图（需 torch/torchvision，且 CUDA 可用）",
+    )
+    parser.add_argument(
+        "--force-detect",
+        action="store_true",
+        help="即使 EXIF 已给出方向也运行 OCR 方向检测（EXIF 不可信时用）",
+    )
     args = parser.parse_args()
 
+    global GPU_DECODE, FORCE_DETECT
+    GPU_DECODE = args.gpu_decode
+    os.environ["IMG2PDF_GPU_DECODE"] = "1" if GPU_DECODE else "0"
+    FORCE_DETECT = args.force_detect
+    os.environ["IMG2PDF_FORCE_DETECT"] = "1" if FORCE_DETECT else "0"
+    if GPU_DECODE and not _gpu_available():
+        log_warn("未检测到可用 CUDA 设备，--gpu-decode 将回退 CPU 解码")
+
     src = os.path.abspath(args.src)
     if not os.path.isdir(src):
         log_err(f"源目录不存在：{src}")